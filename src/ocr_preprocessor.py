@@ -1,17 +1,57 @@
 import os
-import json
+import asyncio
 import hashlib
+import mmap
+import re
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 import logging
 from .paper_parser import PaperParser  # Use relative import with dot notation
 from mistralai import Mistral
+from mistralai.utils import BackoffStrategy, RetryConfig
+import httpx
+import orjson
+import zstandard
 
 # Logger setup
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# Cache files are zstd-compressed JSON. zstd contexts are not thread-safe and
+# cache reads and writes run in worker threads, so each call creates its own.
+CACHE_SUFFIX = ".json.zst"
+# Uncompressed cache files from older versions, which are no longer read:
+# {md5}_{size}_{mtime}.json and {size}-{mtime_ns}-{inode}__{hash}.json
+LEGACY_CACHE_NAME_RE = re.compile(r"[0-9a-f]{32}_\d+_\d+(?:\.\d+)?\.json|\d+-\d+-\d+__[0-9a-f]{32}\.json")
+CACHE_COMPRESSION_LEVEL = 3
+
+# Per-attempt timeouts, so a stalled connection fails and is retried instead of hanging.
+# OCR responses arrive only once the whole document is processed, so they get much longer.
+HTTP_TIMEOUT_MS = 60_000
+OCR_TIMEOUT_MS = 600_000
+
+# Retry rate limits, 5xx responses and connection errors with exponential backoff.
+# Retries stop once max_elapsed_time has passed since the first attempt, so it is
+# several times the attempt timeout to leave room for retrying a timed-out attempt.
+RETRY_CONFIG = RetryConfig(
+    "backoff",
+    BackoffStrategy(initial_interval=500, max_interval=10_000, exponent=2.0, max_elapsed_time=5 * HTTP_TIMEOUT_MS),
+    retry_connection_errors=True,
+)
+OCR_RETRY_CONFIG = RetryConfig(
+    "backoff",
+    BackoffStrategy(initial_interval=500, max_interval=10_000, exponent=2.0, max_elapsed_time=3 * OCR_TIMEOUT_MS),
+    retry_connection_errors=True,
+)
+
+# Keep-alive pool size, large enough for concurrent batch requests
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32)
+
+# Parallel unlinks when cleaning the cache, to overlap latency on network filesystems
+CACHE_CLEAN_WORKERS = 8
+
 
 class OCRProcessor:
     def __init__(self, api_key: str):
@@ -21,12 +61,43 @@ class OCRProcessor:
         if not api_key:
             raise ValueError("API key is required for Mistral initialization.")
         
-        self.client = Mistral(api_key=api_key)
+        self.api_key = api_key
+        # One pooled HTTP client per processor so connections are reused across calls.
+        # The SDK does not close clients passed in, close() does.
+        self.http_client = httpx.Client(limits=HTTP_LIMITS, follow_redirects=True)
+        self.client = self._create_client()
         self.cache_dir = Path("cache")
         self.cache_dir.mkdir(exist_ok=True)
         self.cache_enabled = True
+        # (stat key, content hash) of files that missed the cache, so saving
+        # their results does not hash the content a second time
+        self._missed_cache_keys: Dict[str, Tuple[str, str]] = {}
         self.parser = PaperParser()
 
+    def _create_client(self, async_client: Optional[httpx.AsyncClient] = None) -> Mistral:
+        """
+        Creates a Mistral client on the shared HTTP client, with retries and timeouts.
+        """
+        return Mistral(
+            api_key=self.api_key,
+            client=self.http_client,
+            async_client=async_client,
+            retry_config=RETRY_CONFIG,
+            timeout_ms=HTTP_TIMEOUT_MS,
+        )
+
+    def close(self) -> None:
+        """
+        Closes the HTTP client.
+        """
+        self.http_client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
     def upload_file(self, file_path: str):
         """
         Uploads the file to Mistral API.
@@ -68,6 +139,58 @@ class OCRProcessor:
                     "document_url": signed_url.url,
                 },
                 include_image_base64=True,
+                retries=OCR_RETRY_CONFIG,
+                timeout_ms=OCR_TIMEOUT_MS,
+            )
+            logger.info("OCR process completed successfully.")
+            return ocr_response
+        except Exception as e:
+            logger.error(f"OCR process error: {e}")
+            return None
+
+    async def upload_file_async(self, client: Mistral, file_path: str):
+        """
+        Uploads the file to Mistral API without blocking the event loop.
+        """
+        try:
+            with open(file_path, "rb") as file_handle:
+                uploaded_pdf = await client.files.upload_async(
+                    file={
+                        "file_name": Path(file_path).name,
+                        "content": file_handle,
+                    },
+                    purpose="ocr",
+                )
+            logger.info(f"File uploaded successfully: {file_path}")
+            return uploaded_pdf
+        except Exception as e:
+            logger.error(f"File upload error: {e}")
+            return None
+
+    async def get_signed_url_async(self, client: Mistral, uploaded_pdf):
+        """
+        Retrieves a signed URL for the uploaded file without blocking the event loop.
+        """
+        try:
+            return await client.files.get_signed_url_async(file_id=uploaded_pdf.id)
+        except Exception as e:
+            logger.error(f"Error retrieving signed URL: {e}")
+            return None
+
+    async def process_ocr_async(self, client: Mistral, signed_url, model: str = "mistral-ocr-latest"):
+        """
+        Processes OCR with the specified model without blocking the event loop.
+        """
+        try:
+            ocr_response = await client.ocr.process_async(
+                model=model,
+                document={
+                    "type": "document_url",
+                    "document_url": signed_url.url,
+                },
+                include_image_base64=True,
+                retries=OCR_RETRY_CONFIG,
+                timeout_ms=OCR_TIMEOUT_MS,
             )
             logger.info("OCR process completed successfully.")
             return ocr_response
@@ -95,38 +218,155 @@ class OCRProcessor:
             return None
 
         ocr_response = self.process_ocr(signed_url)
-        response_dict = json.loads(ocr_response.model_dump_json())
+        return self._parse_and_cache(file_path, ocr_response)
+
+    async def get_ocr_results(self, file_paths: List[str], max_concurrency: int = 8) -> List[Optional[Dict[str, Any]]]:
+        """
+        Retrieves OCR results for several files, checks cache first.
+        Uploads and OCR requests of different files run concurrently,
+        with at most max_concurrency files in flight at a time.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        # Pooled connections are bound to the event loop that opened them, so each
+        # batch (usually its own asyncio.run) gets a fresh async client
+        async with httpx.AsyncClient(limits=HTTP_LIMITS, follow_redirects=True) as async_http_client:
+            client = self._create_client(async_http_client)
+            return await asyncio.gather(
+                *(self._get_ocr_result_async(client, file_path, semaphore) for file_path in file_paths)
+            )
+
+    async def _get_ocr_result_async(self, client: Mistral, file_path: str, semaphore: asyncio.Semaphore):
+        """
+        Retrieves OCR results for one file of a batch, checks cache first.
+        A failure only loses this file's result, not the whole batch.
+        """
+        try:
+            return await self._fetch_ocr_result_async(client, file_path, semaphore)
+        except Exception as e:
+            logger.error(f"Error processing {file_path}: {e}")
+            return None
+
+    async def _fetch_ocr_result_async(self, client: Mistral, file_path: str, semaphore: asyncio.Semaphore):
+        """
+        Runs the cache lookup, upload, OCR and parsing steps for one file of a batch.
+        """
+        # Cache hits do not wait for a slot. Hashing, parsing and compression
+        # run in worker threads so they do not stall other in-flight requests
+        cache_result = await asyncio.to_thread(self._check_cache, file_path)
+        if cache_result:
+            logger.info(f"Using cached data: {file_path}")
+            return cache_result
+
+        async with semaphore:
+            uploaded_pdf = await self.upload_file_async(client, file_path)
+            if not uploaded_pdf:
+                logger.error("File upload failed. OCR process cannot start.")
+                return None
+
+            signed_url = await self.get_signed_url_async(client, uploaded_pdf)
+            if not signed_url:
+                logger.error("Failed to retrieve signed URL.")
+                return None
+
+            ocr_response = await self.process_ocr_async(client, signed_url)
+
+        return await asyncio.to_thread(self._parse_and_cache, file_path, ocr_response)
+
+    def _parse_and_cache(self, file_path: str, ocr_response) -> Optional[Dict[str, Any]]:
+        """
+        Parses the OCR response and caches the paper structure.
+        """
+        if not ocr_response:
+            logger.error("OCR process failed.")
+            return None
+
+        response_dict = ocr_response.model_dump(mode="json")
         paper_structure = self.parser.parse_paper(response_dict)
 
         if paper_structure:
             self._save_to_cache(file_path, paper_structure)
         return paper_structure
 
+    def _stat_key(self, file_path: str) -> str:
+        """
+        Builds a cheap cache key from file metadata (no content read).
+        """
+        file_stats = os.stat(file_path)
+        return f"{file_stats.st_size}-{file_stats.st_mtime_ns}-{file_stats.st_ino}"
+
+    def _hash_file(self, file_path: str) -> str:
+        """
+        Hashes the file content.
+        """
+        hasher = hashlib.blake2b(digest_size=16)
+        with open(file_path, "rb") as f:
+            # Hash straight from a memory map instead of copying chunks into bytes objects
+            # (empty files cannot be mapped, and hash to the empty digest)
+            if os.fstat(f.fileno()).st_size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    hasher.update(mapped)
+        return hasher.hexdigest()
+
     def _get_cache_path(self, file_path: str) -> Path:
         """
         Generates a cache path for the file.
         """
         try:
-            with open(file_path, "rb") as f:
-                file_hash = hashlib.md5(f.read()).hexdigest()
+            stat_key = self._stat_key(file_path)
+            # Reuse the hash from the cache lookup unless the file changed since
+            missed_key = self._missed_cache_keys.pop(file_path, None)
+            if missed_key and missed_key[0] == stat_key:
+                file_hash = missed_key[1]
+            else:
+                file_hash = self._hash_file(file_path)
+            return self.cache_dir / f"{stat_key}__{file_hash}{CACHE_SUFFIX}"
+        except Exception as e:
+            logger.error(f"Failed to generate cache path: {e}")
+            return None
 
-            file_stats = os.stat(file_path)
-            file_hash += f"_{file_stats.st_size}_{file_stats.st_mtime}"
+    def _find_cache_path(self, file_path: str) -> Optional[Path]:
+        """
+        Finds an existing cache file, hashing the content only on a stat miss.
+        """
+        try:
+            # Fast path: same file as last time, no need to read its content
+            stat_key = self._stat_key(file_path)
+            cache_path = next(self.cache_dir.glob(f"{stat_key}__*{CACHE_SUFFIX}"), None)
+            if cache_path:
+                return cache_path
 
-            return self.cache_dir / f"{file_hash}.json"
+            # File was touched or copied: look it up by content hash
+            file_hash = self._hash_file(file_path)
+            cache_path = next(self.cache_dir.glob(f"*__{file_hash}{CACHE_SUFFIX}"), None)
+            if cache_path:
+                # Link it under the new stat key so the next lookup hits the fast path.
+                # The old name stays, so copies of the same PDF do not steal the entry
+                # from each other.
+                linked_path = self.cache_dir / f"{stat_key}__{file_hash}{CACHE_SUFFIX}"
+                try:
+                    os.link(cache_path, linked_path)
+                except FileExistsError:
+                    # Another lookup of the same file linked it first
+                    pass
+                except OSError as e:
+                    logger.warning(f"Failed to link cache file: {e}")
+                    return cache_path
+                return linked_path
+            self._missed_cache_keys[file_path] = (stat_key, file_hash)
+            return None
         except Exception as e:
-            logger.error(f"Failed to generate cache path: {e}")
+            logger.error(f"Failed to look up cache path: {e}")
             return None
 
     def _check_cache(self, file_path: str) -> Optional[Dict[str, Any]]:
         """
         Checks if cached OCR results exist.
         """
-        cache_path = self._get_cache_path(file_path)
-        if cache_path and cache_path.exists():
+        cache_path = self._find_cache_path(file_path)
+        if cache_path:
             try:
-                with open(cache_path, "r", encoding="utf-8") as f:
-                    cache_data = json.load(f)
+                with open(cache_path, "rb") as f:
+                    cache_data = orjson.loads(zstandard.ZstdDecompressor().decompress(f.read()))
                 logger.info(f"Cache data loaded: {cache_path}")
                 return cache_data
             except Exception as e:
@@ -142,27 +382,47 @@ class OCRProcessor:
 
         cache_path = self._get_cache_path(file_path)
         try:
-            with open(cache_path, "w", encoding="utf-8") as f:
-                json.dump(ocr_result, f, ensure_ascii=False, indent=2)
+            with open(cache_path, "wb") as f:
+                f.write(zstandard.ZstdCompressor(level=CACHE_COMPRESSION_LEVEL).compress(orjson.dumps(ocr_result)))
             logger.info(f"OCR results cached: {cache_path}")
         except Exception as e:
             logger.error(f"Error saving to cache: {e}")
 
     def _clean_cache(self, max_age_days: int = 7):
         """
-        Removes old cache files.
+        Removes old cache files, and legacy cache files whatever their age.
+        Other files in the cache directory are left alone.
         """
-        now = time.time()
-        for cache_file in self.cache_dir.glob("*.json"):
-            try:
-                if cache_file.stat().st_mtime < now - max_age_days * 86400:
-                    cache_file.unlink()
-                    logger.info(f"Deleted old cache file: {cache_file}")
-            except Exception as e:
-                logger.error(f"Error cleaning cache: {e}")
+        cutoff = time.time() - max_age_days * 86400
+        old_files = []
+        try:
+            with os.scandir(self.cache_dir) as entries:
+                for entry in entries:
+                    try:
+                        if LEGACY_CACHE_NAME_RE.fullmatch(entry.name):
+                            old_files.append(entry.path)
+                        elif entry.name.endswith(CACHE_SUFFIX) and entry.stat().st_mtime < cutoff:
+                            old_files.append(entry.path)
+                    except Exception as e:
+                        logger.error(f"Error cleaning cache: {e}")
+        except Exception as e:
+            logger.error(f"Error cleaning cache: {e}")
+            return
+
+        with ThreadPoolExecutor(max_workers=CACHE_CLEAN_WORKERS) as executor:
+            executor.map(self._remove_cache_file, old_files)
+
+    def _remove_cache_file(self, cache_file: str) -> None:
+        """
+        Removes a single cache file.
+        """
+        try:
+            os.unlink(cache_file)
+            logger.info(f"Deleted old cache file: {cache_file}")
+        except Exception as e:
+            logger.error(f"Error cleaning cache: {e}")
 
     # TODO: Make it work with URL  
     # TODO: Add cron job or background task for automatic cache cleanup.
     # TODO: Convert cache_data to OCRResponse if needed.
-    # TODO: Implement retry logic for failed OCR requests.
 
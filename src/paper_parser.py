@@ -1,12 +1,121 @@
-import json
 import logging
-from typing import Dict, List, Any, Optional, Union
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Tuple, Union
 from pathlib import Path
 import re
 import os
+import orjson
+import simdjson
 
 logger = logging.getLogger(__name__)
 
+# Precompiled patterns used while parsing papers
+_ABSTRACT_RE = re.compile(r'(?:####\s*Abstract|Abstract)(?:\n+|\s+)(.*?)(?=\n\n\n|\n##|\n#)', re.DOTALL | re.IGNORECASE)
+# Structural elements of the markdown, matched together in a single pass:
+# - # and ## headers, as well as numbered headers like "1. Introduction"
+# - formulas between $$ and $$ or $ and $ (inline ones stay on one line)
+#   Block formulas never span sections: a $$ left unclosed must not pair with
+#   one in a later section and swallow the headers in between.
+# - image references like ![img-0.jpeg](img-0.jpeg), with an optional "title"
+#   Inline formulas stop before a "![" so a stray $ does not hide an image on
+#   its line; an image inside a $$ block formula is still not seen.
+# Every alternative starts with a newline, $ or !, which lets the regex engine
+# skip ahead to candidate positions instead of trying each character.
+_STRUCTURE_RE = re.compile(
+    r'\n(?P<header>(?:#{1,2}\s+|\d+\.\s+)(?P<title>[^\n]+))'
+    r'|\$\$(?P<block>(?:(?!\n(?:#{1,2}\s|\d+\.\s)).)*?)\$\$'
+    r'|\$(?P<inline>(?:[^$\n!]|!(?!\[))*)\$'
+    r'|!\[[^\]\n]*\]\((?P<image>[^)\s]+)(?:\s+"[^"]*")?\)',
+    re.DOTALL
+)
+_REF_SECTION_RE = re.compile(r'(?:##\s*References|References)(?:\n+|\s+)(.*?)(?=\n\n\n|\n##|\n#|$)', re.DOTALL | re.IGNORECASE)
+# Start of a reference numbered as [1] or 1. at the beginning of a line,
+# optionally indented and/or behind a list bullet like "- [1]"
+_REF_START_RE = re.compile(r'\n[ \t]*(?:[-*+][ \t]+)?(?:\[(\d+)\]|(\d+)\.)\s+')
+_REF_LINE_START_RE = re.compile(r'(?:[-*+]\s+)?(?:\[\d+\]|\d+\.)')
+_AFFIL_RE = re.compile(r'<br>(.*?)(?=\n\n|\n####)')
+_DOI_RE = re.compile(r'doi[:\s]+([^\s]+)', re.IGNORECASE)
+# First line starting with "# ", used as the title
+_TITLE_RE = re.compile(r'^# ([^\n]*)', re.MULTILINE)
+_KEYWORDS_RE = re.compile(r'keywords', re.IGNORECASE)
+_ABSTRACT_WORD_RE = re.compile(r'abstract', re.IGNORECASE)
+
+
+class _SafeFilenameTable(dict):
+    """
+    str.translate table that maps every non-alphanumeric character to "_"
+    
+    Entries are filled in on first use, so any Unicode character is handled
+    and repeated characters are looked up in C.
+    """
+    
+    def __missing__(self, char: int) -> int:
+        self[char] = char if chr(char).isalnum() else ord("_")
+        return self[char]
+
+
+_SAFE_FILENAME_TABLE = _SafeFilenameTable()
+
+
+@dataclass
+class _FirstPageView:
+    """
+    First page of a paper, scanned once and shared by the title, abstract
+    and metadata extractors
+    """
+    markdown: str
+    title: str
+    # Offset of the title in markdown
+    title_idx: int
+    abstract_match: Optional[re.Match]
+    affiliation_match: Optional[re.Match]
+    # Offset of the word "keywords" in markdown, -1 if not found
+    keywords_idx: int
+    doi_match: Optional[re.Match]
+    
+    @classmethod
+    def from_ocr(cls, ocr_data: Dict[str, Any]) -> Optional["_FirstPageView"]:
+        """
+        Scan the first page of OCR-processed paper data
+        
+        Args:
+            ocr_data: OCR-processed paper data
+            
+        Returns:
+            First page view, or None if the paper has no pages
+        """
+        pages = ocr_data.get("pages")
+        if not pages:
+            return None
+        
+        markdown = pages[0].get("markdown", "")
+        
+        # Look for title line starting with # in markdown,
+        # otherwise the first line is usually the title
+        title_match = _TITLE_RE.search(markdown)
+        if title_match:
+            title_line = title_match.group(1)
+            title_line_idx = title_match.start(1)
+        else:
+            title_line = markdown.partition('\n')[0]
+            title_line_idx = 0
+        title = title_line.strip()
+        # The title starts after any whitespace stripped from its line
+        title_idx = title_line_idx + len(title_line) - len(title_line.lstrip())
+        
+        keywords_match = _KEYWORDS_RE.search(markdown)
+        
+        return cls(
+            markdown=markdown,
+            title=title,
+            title_idx=title_idx,
+            abstract_match=_ABSTRACT_RE.search(markdown),
+            affiliation_match=_AFFIL_RE.search(markdown),
+            keywords_idx=keywords_match.start() if keywords_match else -1,
+            doi_match=_DOI_RE.search(markdown)
+        )
+
+
 class PaperParser:
     """
     Class for parsing OCR-processed academic paper JSONs
@@ -35,23 +144,30 @@ class PaperParser:
         try:
             # Convert to dict if JSON string
             if isinstance(ocr_data, str):
-                ocr_data = json.loads(ocr_data)
+                ocr_data = orjson.loads(ocr_data)
             
             # Create paper structure
+            first_page = self._scan_first_page(ocr_data)
+            title = self._extract_title(first_page)
+            abstract = self._extract_abstract(first_page)
+            # Walk the pages once; sections and references share the result
+            full_markdown, images_by_id = self._combine_pages(ocr_data.get("pages"))
+            sections, images = self._extract_sections(full_markdown, images_by_id)
             paper_structure = {
-                "title": self._extract_title(ocr_data),
-                "abstract": self._extract_abstract(ocr_data),
-                "sections": self._extract_sections(ocr_data),
-                "references": self._extract_references(ocr_data),
-                "metadata": self._extract_metadata(ocr_data)
+                "title": title,
+                "abstract": abstract,
+                "sections": sections,
+                "images": images,
+                "references": self._extract_references(full_markdown),
+                "metadata": self._extract_metadata(first_page)
             }
             
             # Save parsed data
             if save_output:
                 if output_filename is None:
                     # Create filename from title
-                    safe_title = "".join(c if c.isalnum() else "_" for c in paper_structure["title"])
-                    safe_title = safe_title[:50] if safe_title else "parsed_paper"  # Limit filename length
+                    safe_title = paper_structure["title"][:50].translate(_SAFE_FILENAME_TABLE)  # Limit filename length
+                    safe_title = safe_title or "parsed_paper"
                     output_filename = f"parsed_{safe_title}.json"
                 
                 output_path = self.output_dir / output_filename
@@ -77,8 +193,10 @@ class PaperParser:
             Parsed paper structure
         """
         try:
-            with open(json_file_path, 'r', encoding='utf-8') as f:
-                ocr_data = json.load(f)
+            # Load lazily: values are only turned into Python objects when accessed,
+            # so base64 data of images that no section references is never decoded
+            parser = simdjson.Parser()
+            ocr_data = parser.load(json_file_path)
             
             # Generate output filename from input if not specified
             if save_output and output_filename is None:
@@ -90,198 +208,242 @@ class PaperParser:
             logger.error(f"Error reading JSON file: {e}")
             raise
     
-    def _extract_title(self, ocr_data: Dict[str, Any]) -> str:
+    def _scan_first_page(self, ocr_data: Dict[str, Any]) -> Optional[_FirstPageView]:
         """
-        Extract paper title
+        Scan the first page once for the title, abstract and metadata extractors
         
         Args:
             ocr_data: OCR-processed paper data
             
         Returns:
-            Paper title
+            First page view, or None if the paper has no pages or it cannot be read
         """
         try:
-            if "pages" in ocr_data and len(ocr_data["pages"]) > 0:
-                first_page = ocr_data["pages"][0]
-                markdown = first_page.get("markdown", "")
-                
-                # Look for title line starting with # in markdown
-                lines = markdown.split('\n')
-                for line in lines:
-                    if line.startswith('# '):
-                        return line[2:].strip()
-                
-                # If no title found, look at first few lines of first page
-                if lines and len(lines) > 0:
-                    # First line is usually the title
-                    return lines[0].strip()
-            
-            return "Title not found"
+            return _FirstPageView.from_ocr(ocr_data)
         
         except Exception as e:
-            logger.error(f"Error extracting title: {e}")
+            logger.error(f"Error scanning first page: {e}")
+            return None
+    
+    def _extract_title(self, first_page: Optional[_FirstPageView]) -> str:
+        """
+        Extract paper title
+        
+        Args:
+            first_page: First page view, as returned by _scan_first_page
+            
+        Returns:
+            Paper title
+        """
+        if first_page is None:
             return "Title not found"
+        return first_page.title
     
-    def _extract_abstract(self, ocr_data: Dict[str, Any]) -> str:
+    def _extract_abstract(self, first_page: Optional[_FirstPageView]) -> str:
         """
         Extract paper abstract
         
         Args:
-            ocr_data: OCR-processed paper data
+            first_page: First page view, as returned by _scan_first_page
             
         Returns:
             Paper abstract
         """
+        if first_page is None or not first_page.abstract_match:
+            return "Abstract not found"
+        return first_page.abstract_match.group(1).strip()
+    
+    def _combine_pages(self, pages: Optional[List[Dict[str, Any]]]) -> Tuple[str, Dict[str, Tuple[int, Any]]]:
+        """
+        Combine all pages' markdown content and index their images by id
+        
+        Args:
+            pages: Pages of the OCR-processed paper data, or None if missing
+            
+        Returns:
+            Combined markdown ("" if there are no pages) and (page index, image) by image id
+        """
+        markdown_parts = []
+        images_by_id = {}
+        
         try:
-            if "pages" in ocr_data and len(ocr_data["pages"]) > 0:
-                first_page = ocr_data["pages"][0]
-                markdown = first_page.get("markdown", "")
+            if pages is None:
+                return "", images_by_id
+            
+            for page in pages:
+                page_idx = page.get("index", 0)
+                markdown_parts.append(page.get("markdown", ""))
                 
-                # Look for abstract section
-                abstract_match = re.search(r'(?:####\s*Abstract|Abstract)(?:\n+|\s+)(.*?)(?=\n\n\n|\n##|\n#)', markdown, re.DOTALL | re.IGNORECASE)
-                if abstract_match:
-                    return abstract_match.group(1).strip()
+                # Collect images from this page
+                for img in page.get("images") or []:
+                    img_id = img.get("id", "")
+                    if img_id:
+                        images_by_id.setdefault(img_id, (page_idx, img))
             
-            return "Abstract not found"
+            return "\n\n".join(markdown_parts) + "\n\n", images_by_id
         
         except Exception as e:
-            logger.error(f"Error extracting abstract: {e}")
-            return "Abstract not found"
+            logger.error(f"Error combining pages: {e}")
+            return "", {}
     
-    def _extract_sections(self, ocr_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _extract_sections(self, full_markdown: str, images_by_id: Dict[str, Tuple[int, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
         """
         Extract paper sections with text, images, and formulas
         
+        Sections only list the ids of their images; the image data is returned
+        once per image in a separate mapping, however many sections refer to it.
+        
         Args:
-            ocr_data: OCR-processed paper data
+            full_markdown: Combined markdown of all pages, as returned by _combine_pages
+            images_by_id: Page images by id, as returned by _combine_pages
             
         Returns:
-            List of sections with their content
+            List of sections with their content, and the referenced images by id
         """
         sections = []
+        images = {}
         
         try:
-            if "pages" not in ocr_data:
-                return sections
-            
-            # Combine all pages' markdown content
-            full_markdown = ""
-            images_by_page = {}
-            
-            for page in ocr_data["pages"]:
-                page_idx = page.get("index", 0)
-                markdown = page.get("markdown", "")
-                full_markdown += markdown + "\n\n"
-                
-                # Collect images from this page
-                images = page.get("images", [])
-                if images:
-                    images_by_page[page_idx] = images
+            if not full_markdown:
+                return sections, images
             
             # Split markdown into sections based on headers
-            # Match both # and ## headers, as well as numbered headers like "1. Introduction"
-            section_pattern = r'(?:^|\n)(?:#{1,2}\s+|(?:\d+\.)\s+)([^\n]+)(?:\n|$)'
-            section_matches = list(re.finditer(section_pattern, full_markdown, re.MULTILINE))
+            sections, section_image_ids = self._scan_markdown(full_markdown)
             
             # If no sections found, treat the whole document as one section
-            if not section_matches:
+            if not sections:
                 section = {
                     "title": "Document",
                     "text": [full_markdown.strip()],
-                    "images": [],
+                    "image_ids": list(images_by_id),
                     "formulas": []
                 }
                 
                 # Add all images to this section
-                for page_idx, images in images_by_page.items():
-                    for img in images:
-                        section["images"].append({
-                            "page": page_idx,
-                            "id": img.get("id", ""),
-                            "base64": img.get("image_base64", ""),
-                            "coordinates": {
-                                "top_left_x": img.get("top_left_x", 0),
-                                "top_left_y": img.get("top_left_y", 0),
-                                "bottom_right_x": img.get("bottom_right_x", 0),
-                                "bottom_right_y": img.get("bottom_right_y", 0)
-                            }
-                        })
+                for img_id, (page_idx, img) in images_by_id.items():
+                    images[img_id] = self._build_image_entry(page_idx, img)
                 
                 sections.append(section)
-                return sections
+                return sections, images
             
-            # Process each section
-            for i, match in enumerate(section_matches):
-                section_title = match.group(1).strip()
-                section_start = match.start()
-                
-                # Determine section end (next section start or end of document)
-                if i < len(section_matches) - 1:
-                    section_end = section_matches[i + 1].start()
-                else:
-                    section_end = len(full_markdown)
-                
-                section_content = full_markdown[section_start:section_end].strip()
-                
-                # Remove the section title from the content
-                section_content = re.sub(r'^(?:#{1,2}\s+|(?:\d+\.)\s+)([^\n]+)(?:\n|$)', '', section_content, 1)
-                
-                # Extract formulas (text between $ and $ or $$ and $$)
-                formulas = []
-                formula_pattern = r'\$\$(.*?)\$\$|\$(.*?)\$'
-                formula_matches = re.finditer(formula_pattern, section_content, re.DOTALL)
-                
-                for f_match in formula_matches:
-                    formula_text = f_match.group(1) or f_match.group(2)
-                    if formula_text:
-                        formulas.append(formula_text.strip())
-                
-                # Remove formulas from text for cleaner text content
-                clean_text = re.sub(formula_pattern, ' FORMULA ', section_content)
-                
-                # Split text into paragraphs
-                paragraphs = [p.strip() for p in clean_text.split('\n\n') if p.strip()]
-                
-                # Create section object
-                section = {
-                    "title": section_title,
-                    "text": paragraphs,
-                    "images": [],
-                    "formulas": formulas
-                }
-                
-                # Find images that belong to this section
-                # This is a heuristic - we check if image references appear in the section content
-                for page_idx, images in images_by_page.items():
-                    for img in images:
-                        img_id = img.get("id", "")
-                        if img_id and img_id in section_content:
-                            section["images"].append({
-                                "page": page_idx,
-                                "id": img_id,
-                                "base64": img.get("image_base64", ""),
-                                "coordinates": {
-                                    "top_left_x": img.get("top_left_x", 0),
-                                    "top_left_y": img.get("top_left_y", 0),
-                                    "bottom_right_x": img.get("bottom_right_x", 0),
-                                    "bottom_right_y": img.get("bottom_right_y", 0)
-                                }
-                            })
-                
-                sections.append(section)
+            # Attach the images referenced in each section's markdown
+            for section, image_ids in zip(sections, section_image_ids):
+                for img_id in dict.fromkeys(image_ids):
+                    if img_id not in images_by_id:
+                        continue
+                    section["image_ids"].append(img_id)
+                    if img_id not in images:
+                        page_idx, img = images_by_id[img_id]
+                        images[img_id] = self._build_image_entry(page_idx, img)
             
-            return sections
+            return sections, images
         
         except Exception as e:
             logger.error(f"Error extracting sections: {e}")
-            return sections
+            return sections, images
+    
+    def _build_image_entry(self, page_idx: int, img: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the stored representation of an OCR image
+        
+        Args:
+            page_idx: Index of the page the image is on
+            img: Image data from the OCR response
+            
+        Returns:
+            Image page, base64 data and coordinates
+        """
+        return {
+            "page": page_idx,
+            "base64": img.get("image_base64", ""),
+            "coordinates": {
+                "top_left_x": img.get("top_left_x", 0),
+                "top_left_y": img.get("top_left_y", 0),
+                "bottom_right_x": img.get("bottom_right_x", 0),
+                "bottom_right_y": img.get("bottom_right_y", 0)
+            }
+        }
+    
+    def _scan_markdown(self, markdown: str) -> Tuple[List[Dict[str, Any]], List[List[str]]]:
+        """
+        Split markdown into sections with paragraphs and formulas in a single pass
+        
+        Headers, formulas and image references are found by one combined pattern,
+        so the markdown is walked once instead of once per extraction step.
+        Text before the first header is not part of any section.
+        
+        Args:
+            markdown: Combined markdown of all pages
+            
+        Returns:
+            Sections (with empty image_ids) and the image ids referenced in each section
+        """
+        sections = []
+        section_image_ids = []
+        section = None
+        pieces = []
+        
+        # Headers are matched by their leading newline, so one is added in front
+        # to catch a header on the very first line
+        text = "\n" + markdown
+        pos = 0
+        
+        for match in _STRUCTURE_RE.finditer(text):
+            kind = match.lastgroup
+            
+            if kind == "header":
+                if section is not None:
+                    pieces.append(text[pos:match.start()])
+                    section["text"] = self._split_paragraphs(pieces)
+                pos = match.end()
+                section = {
+                    "title": match.group("title").strip(),
+                    "text": [],
+                    "image_ids": [],
+                    "formulas": []
+                }
+                sections.append(section)
+                section_image_ids.append([])
+                pieces = []
+            elif section is None:
+                continue
+            elif kind == "image":
+                # The reference stays in the text, only its id is recorded
+                section_image_ids[-1].append(match.group("image"))
+            else:
+                # Keep the formula and leave a placeholder for cleaner text content
+                formula_text = match.group(kind)
+                if formula_text:
+                    section["formulas"].append(formula_text.strip())
+                pieces.append(text[pos:match.start()])
+                pieces.append(" FORMULA ")
+                pos = match.end()
+        
+        if section is not None:
+            pieces.append(text[pos:])
+            section["text"] = self._split_paragraphs(pieces)
+        
+        return sections, section_image_ids
     
-    def _extract_references(self, ocr_data: Dict[str, Any]) -> List[str]:
+    def _split_paragraphs(self, pieces: List[str]) -> List[str]:
+        """
+        Join the text pieces of a section and split them into paragraphs
+        
+        Args:
+            pieces: Section text with formulas already replaced
+            
+        Returns:
+            Non-empty paragraphs
+        """
+        # Strip each paragraph once, with the loop running in C
+        return list(filter(None, map(str.strip, "".join(pieces).split('\n\n'))))
+    
+    def _extract_references(self, full_markdown: str) -> List[str]:
         """
         Extract paper references
         
         Args:
-            ocr_data: OCR-processed paper data
+            full_markdown: Combined markdown of all pages, as returned by _combine_pages
             
         Returns:
             List of references
@@ -289,28 +451,23 @@ class PaperParser:
         references = []
         
         try:
-            if "pages" not in ocr_data:
-                return references
-            
-            # Combine all pages' markdown content
-            full_markdown = ""
-            for page in ocr_data["pages"]:
-                full_markdown += page.get("markdown", "") + "\n\n"
-            
             # Look for references section
-            ref_match = re.search(r'(?:##\s*References|References)(?:\n+|\s+)(.*?)(?=\n\n\n|\n##|\n#|$)', full_markdown, re.DOTALL | re.IGNORECASE)
+            ref_match = _REF_SECTION_RE.search(full_markdown)
             if not ref_match:
                 return references
             
             ref_content = ref_match.group(1).strip()
             
             # Try to extract references by pattern [1] or 1.
-            ref_pattern = r'(?:\[(\d+)\]|\n(\d+)\.)\s+(.*?)(?=\n\[|\n\d+\.|$)'
-            ref_matches = re.finditer(ref_pattern, '\n' + ref_content, re.DOTALL)
+            # Each reference runs until the next one starts, so slice between
+            # the start markers instead of scanning ahead for every entry
+            ref_block = '\n' + ref_content
+            ref_starts = list(_REF_START_RE.finditer(ref_block))
             
-            for match in ref_matches:
+            for i, match in enumerate(ref_starts):
                 ref_num = match.group(1) or match.group(2)
-                ref_text = match.group(3).strip()
+                ref_end = ref_starts[i + 1].start() if i + 1 < len(ref_starts) else len(ref_block)
+                ref_text = ref_block[match.end():ref_end].strip()
                 if ref_text:
                     references.append(f"[{ref_num}] {ref_text}")
             
@@ -325,7 +482,7 @@ class PaperParser:
                         continue
                     
                     # Check for new reference start
-                    if re.match(r'^\[\d+\]|\d+\.', line):
+                    if _REF_LINE_START_RE.match(line):
                         if current_ref:
                             references.append(current_ref.strip())
                         current_ref = line
@@ -343,12 +500,12 @@ class PaperParser:
             logger.error(f"Error extracting references: {e}")
             return references
     
-    def _extract_metadata(self, ocr_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _extract_metadata(self, first_page: Optional[_FirstPageView]) -> Dict[str, Any]:
         """
         Extract paper metadata
         
         Args:
-            ocr_data: OCR-processed paper data
+            first_page: First page view, as returned by _scan_first_page
             
         Returns:
             Metadata dictionary
@@ -363,51 +520,47 @@ class PaperParser:
         }
         
         try:
-            if "pages" in ocr_data and len(ocr_data["pages"]) > 0:
-                first_page = ocr_data["pages"][0]
-                markdown = first_page.get("markdown", "")
+            if first_page is not None:
+                markdown = first_page.markdown
                 
                 # Find authors
                 # Usually they come after the title and before the abstract
-                title = self._extract_title(ocr_data)
-                if title != "Title not found" and title in markdown:
-                    after_title = markdown[markdown.find(title) + len(title):]
-                    abstract_idx = after_title.lower().find('abstract')
-                    
-                    if abstract_idx != -1:
-                        author_section = after_title[:abstract_idx].strip()
-                        # Split by lines and find potential authors
-                        lines = author_section.split('\n')
-                        for line in lines:
-                            # Authors are usually separated by commas or <br>
-                            if '<br>' in line:
-                                potential_authors = line.split('<br>')
-                                for author in potential_authors:
-                                    if author.strip() and not author.strip().startswith('#'):
-                                        metadata['authors'].append(author.strip())
-                            elif ',' in line and not line.startswith('http') and not line.startswith('www'):
-                                for author in line.split(','):
-                                    if author.strip() and not author.strip().startswith('#'):
-                                        metadata['authors'].append(author.strip())
+                after_title_idx = first_page.title_idx + len(first_page.title)
+                abstract_match = _ABSTRACT_WORD_RE.search(markdown, after_title_idx)
+                
+                if abstract_match:
+                    author_section = markdown[after_title_idx:abstract_match.start()].strip()
+                    # Split by lines and find potential authors
+                    lines = author_section.split('\n')
+                    for line in lines:
+                        # Authors are usually separated by commas or <br>
+                        if '<br>' in line:
+                            potential_authors = line.split('<br>')
+                            for author in potential_authors:
+                                if author.strip() and not author.strip().startswith('#'):
+                                    metadata['authors'].append(author.strip())
+                        elif ',' in line and not line.startswith('http') and not line.startswith('www'):
+                            for author in line.split(','):
+                                if author.strip() and not author.strip().startswith('#'):
+                                    metadata['authors'].append(author.strip())
                 
                 # Find affiliations
-                affiliation_match = re.search(r'<br>(.*?)(?=\n\n|\n####)', markdown)
-                if affiliation_match:
-                    affiliation = affiliation_match.group(1).strip()
+                if first_page.affiliation_match:
+                    affiliation = first_page.affiliation_match.group(1).strip()
                     metadata['affiliations'].append(affiliation)
                 
                 # Find keywords
-                keywords_idx = markdown.lower().find('keywords')
+                keywords_idx = first_page.keywords_idx
                 if keywords_idx != -1:
-                    keywords_text = markdown[keywords_idx:].split('\n', 1)[0]
+                    line_end = markdown.find('\n', keywords_idx)
+                    keywords_text = markdown[keywords_idx:line_end if line_end != -1 else None]
                     if ':' in keywords_text:
                         keywords = keywords_text.split(':', 1)[1]
                         metadata['keywords'] = [k.strip() for k in keywords.split(',')]
                 
                 # Find DOI
-                doi_match = re.search(r'doi[:\s]+([^\s]+)', markdown, re.IGNORECASE)
-                if doi_match:
-                    metadata['doi'] = doi_match.group(1)
+                if first_page.doi_match:
+                    metadata['doi'] = first_page.doi_match.group(1)
             
             return metadata
         
@@ -424,8 +577,8 @@ class PaperParser:
             output_path: Output file path
         """
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
         except Exception as e:
             logger.error(f"Error saving data: {e}")
             raise